@@ -5,7 +5,6 @@ import os
 import shutil
 import time
 import argparse
-import subprocess
 import signal
 import re 
 import xml.etree.ElementTree as ET
@@ -20,7 +19,7 @@ LOG_DIR = "/var/log/virsh"
 FORBIDDEN_PATTERNS = ['_snap_', '_tmp_', 'snapshot', '.bak']
 
 # --- GLOBAL VARIABLES ---
-CURRENT_DOMAIN_NAME = None
+CURRENT_DOMAIN = None      # virDomain handle of the domain being backed up
 BACKUP_JOB_RUNNING = False
 FILES_TO_CLEANUP = []      # Partial DESTINATION files (.bak)
 
@@ -50,19 +49,19 @@ def setup_logging(domain_name, timestamp):
 # --- CLEANUP AND EMERGENCY ---
 
 def perform_cleanup(exit_after=False):
-    global BACKUP_JOB_RUNNING, CURRENT_DOMAIN_NAME
+    global BACKUP_JOB_RUNNING, CURRENT_DOMAIN
     
     if sys.stdout.isatty(): print() 
     logger.warning("--- CLEANUP PROTOCOL INITIATED ---")
 
     # 1. Abort Libvirt Job (If there is an active one created by this script)
-    if BACKUP_JOB_RUNNING and CURRENT_DOMAIN_NAME:
+    if BACKUP_JOB_RUNNING and CURRENT_DOMAIN is not None:
         logger.warning("Attempting to abort active Libvirt job...")
         try: 
-            subprocess.run(['virsh', 'domjobabort', CURRENT_DOMAIN_NAME], check=True, capture_output=True)
+            CURRENT_DOMAIN.abortJob()
             logger.info(" -> Libvirt job aborted successfully.")
-        except subprocess.CalledProcessError as e:
-            logger.critical(f" -> FAILED to abort job. VM restart might be required. Error: {e.stderr}")
+        except libvirt.libvirtError as e:
+            logger.critical(f" -> FAILED to abort job. VM restart might be required. Error: {e}")
         BACKUP_JOB_RUNNING = False
 
     # 2. Clean partial .bak files (Garbage generated by failure)
@@ -336,12 +335,12 @@ if __name__ == "__main__":
             logger.error(f"VM '{args.domain}' not found in hypervisor.")
             sys.exit(1)
             
-        CURRENT_DOMAIN_NAME = args.domain 
+        CURRENT_DOMAIN = dom
 
         try: 
             if dom.jobInfo()[0] != 0: 
                 logger.warning("Previous job detected. Attempting to abort...")
-                subprocess.run(['virsh', 'domjobabort', args.domain], stderr=subprocess.DEVNULL)
+                dom.abortJob()
         except: pass
 
         bkp_dir = os.path.join(args.backup_dir, args.domain)
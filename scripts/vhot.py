@@ -7,11 +7,16 @@ import time
 import argparse
 import subprocess
 import signal
+import threading
 import re
 import fcntl
+import io
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import logging
+import logging.handlers
+import queue
 
 # --- CONSTANTS ---
 DISK_FORMAT = 'qcow2'
@@ -20,19 +25,39 @@ SAFETY_MARGIN_PERCENT = 0.10
 LOG_DIR = "/var/log/vhot"
 FORBIDDEN_PATTERNS = ['_snap_', '_tmp_', 'snapshot', '.bak']
 BACKUP_TIMEOUT_SECONDS = 14400  # 4 hours hard limit
+EVENT_FALLBACK_POLL_SECONDS = 30  # jobStats() safety-net cadence when events are active
+STATS_POLL_MIN_SECONDS = 0.5  # Adaptive jobStats() cadence when polling is the only
+STATS_POLL_MAX_SECONDS = 5    # completion signal (no event loop available)
+QEMU_IMG = shutil.which('qemu-img')  # Resolved once; None if not installed
+PROGRESS_SPINNER = "|/-\\"
+PROGRESS_TEMPLATE = "INFO: [ALL DISKS] [%s] %.2f GB / %.2f GB (%.1f%%)"  # Built once, %-formatted per tick
+CLEAR_LINE = "\r\033[K"  # Carriage return + erase line (TTY only)
+PROGRESS_REDRAW_SECONDS = 1  # Spinner refresh when the percentage is unchanged
 
 # --- GLOBAL VARIABLES ---
-CURRENT_DOMAIN_NAME = None
+CURRENT_DOMAIN = None       # virDomain handle of the domain being backed up
 BACKUP_JOB_RUNNING = False
 FILES_TO_CLEANUP = []       # Partial DESTINATION files (.bak)
 LOCK_FILE_FD = None         # Lock file descriptor for single-instance enforcement
+EVENT_LOOP_RUNNING = False  # libvirt default event loop pumped by a daemon thread
+EVENT_LOOP_ERROR = None     # Registration failure, logged per domain once logging is up
+LOG_LISTENER = None         # QueueListener writing log records to the log file
+_IS_TTY = sys.stdout.isatty()  # stdout does not change type during a run
+_LAST_PROGRESS = {'perc': None, 'time': 0.0, 'frame': 0}  # Last line drawn by monitor_global_progress
 
 # --- LOGGER ---
 logger = logging.getLogger('virsh_hotbkp')
 logger.setLevel(logging.DEBUG)
 
 
+# --- ERRORS ---
+
+class BackupError(Exception):
+    """A domain backup could not be started or did not complete."""
+
+
 def setup_logging(domain_name, timestamp):
+    global LOG_LISTENER
     try:
         # FIX: Corrected fallback logic — check write access to LOG_DIR parent,
         # and also handle the case where LOG_DIR exists but is not writable.
@@ -50,7 +75,14 @@ def setup_logging(domain_name, timestamp):
 
         file_handler = logging.FileHandler(log_path, encoding='utf-8')
         file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        logger.addHandler(file_handler)
+
+        # The log file is written by a listener thread so a slow /var/log never
+        # stalls the progress/polling loop. The console stays synchronous to keep
+        # its output ordered with the progress line written to stdout.
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        LOG_LISTENER = logging.handlers.QueueListener(log_queue, file_handler)
+        LOG_LISTENER.start()
 
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
@@ -62,6 +94,21 @@ def setup_logging(domain_name, timestamp):
         sys.exit(1)
 
 
+def close_logging():
+    """Detach and close the per-domain handlers installed by setup_logging()."""
+    global LOG_LISTENER
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    # stop() drains the queue before returning, so no record is lost.
+    if LOG_LISTENER is not None:
+        LOG_LISTENER.stop()
+        for handler in LOG_LISTENER.handlers:
+            handler.close()
+        LOG_LISTENER = None
+
+
 # --- LOCK (single-instance per domain) ---
 
 def acquire_lock(domain_name):
@@ -77,12 +124,10 @@ def acquire_lock(domain_name):
         LOCK_FILE_FD.write(str(os.getpid()))
         LOCK_FILE_FD.flush()
     except OSError:
-        print(
-            f"FATAL: Another instance of vhot is already running for domain '{domain_name}'. "
-            f"Lock file: {lock_path}",
-            file=sys.stderr
+        raise BackupError(
+            f"Another instance of vhot is already running for domain '{domain_name}'. "
+            f"Lock file: {lock_path}"
         )
-        sys.exit(1)
 
 
 def release_lock():
@@ -96,6 +141,31 @@ def release_lock():
         LOCK_FILE_FD = None
 
 
+# --- LIBVIRT EVENT LOOP ---
+
+def start_event_loop():
+    """
+    Register libvirt's default event implementation and pump it from a daemon
+    thread so job completion is delivered by callback instead of polling.
+    Must be called before libvirt.open(), i.e. before any log file exists, so a
+    failure is kept in EVENT_LOOP_ERROR and logged by main() for each domain.
+    On failure the backup monitor keeps using jobStats() polling only.
+    """
+    global EVENT_LOOP_RUNNING, EVENT_LOOP_ERROR
+    try:
+        libvirt.virEventRegisterDefaultImpl()
+    except libvirt.libvirtError as e:
+        EVENT_LOOP_ERROR = e
+        return
+
+    def run_loop():
+        while True:
+            libvirt.virEventRunDefaultImpl()
+
+    threading.Thread(target=run_loop, name='libvirt-events', daemon=True).start()
+    EVENT_LOOP_RUNNING = True
+
+
 # --- CLEANUP AND EMERGENCY ---
 
 # FIX: Guard against perform_cleanup() being invoked twice (e.g., signal
@@ -104,30 +174,27 @@ _CLEANUP_RUNNING = False
 
 
 def perform_cleanup(exit_after=False):
-    global BACKUP_JOB_RUNNING, CURRENT_DOMAIN_NAME, _CLEANUP_RUNNING
+    global BACKUP_JOB_RUNNING, CURRENT_DOMAIN, _CLEANUP_RUNNING
 
     if _CLEANUP_RUNNING:
         return
     _CLEANUP_RUNNING = True
 
-    if sys.stdout.isatty():
+    if _IS_TTY:
         print()
     logger.warning("--- CLEANUP PROTOCOL INITIATED ---")
 
     # 1. Abort Libvirt Job (only if one was actually started by this script)
-    if BACKUP_JOB_RUNNING and CURRENT_DOMAIN_NAME:
+    if BACKUP_JOB_RUNNING and CURRENT_DOMAIN is not None:
         logger.warning("Attempting to abort active Libvirt job...")
         try:
-            subprocess.run(
-                ['virsh', 'domjobabort', CURRENT_DOMAIN_NAME],
-                check=True,
-                capture_output=True
-            )
+            # Direct API call on the open connection (no virsh fork/exec).
+            CURRENT_DOMAIN.abortJob()
             logger.info(" -> Libvirt job aborted successfully.")
-        except subprocess.CalledProcessError as e:
+        except libvirt.libvirtError as e:
             logger.critical(
                 f" -> FAILED to abort job. VM restart might be required. "
-                f"Error: {e.stderr.decode(errors='replace').strip()}"
+                f"Error: {e}"
             )
         BACKUP_JOB_RUNNING = False
 
@@ -159,18 +226,39 @@ signal.signal(signal.SIGTERM, signal_handler)
 
 # --- UTILS ---
 
+def _allocated_size(path):
+    """
+    Bytes actually allocated by a (possibly sparse) disk image. This is the
+    same figure `qemu-img info` reports as actual-size for file-backed images,
+    obtained from one stat() instead of a subprocess. Falls back to the
+    apparent size when the filesystem does not report block counts.
+    """
+    st = os.stat(path)
+    allocated = st.st_blocks * 512
+    return min(allocated, st.st_size) if allocated else st.st_size
+
+
 def get_disk_details_from_xml(dom, target_devs_list):
     logger.info(f"Reading XML for disks: {target_devs_list}")
     details = {}
-    found_devs = []
+    wanted_devs = frozenset(target_devs_list)
     try:
-        root = ET.fromstring(dom.XMLDesc(0))
-        for device in root.findall('./devices/disk'):
-            target = device.find('target')
+        # Stream the domain XML instead of building the full tree: each <disk>
+        # is inspected on its end event and cleared right after, so parsing can
+        # stop as soon as every requested disk has been resolved.
+        for _, device in ET.iterparse(io.StringIO(dom.XMLDesc(0)), events=('end',)):
+            if device.tag != 'disk':
+                continue
+            # One pass over the disk's children instead of a find() per element.
+            target = source = None
+            for child in device:
+                if child.tag == 'target' and target is None:
+                    target = child
+                elif child.tag == 'source' and source is None:
+                    source = child
             if target is not None:
                 dev_name = target.get('dev')
-                if dev_name in target_devs_list:
-                    source = device.find('source')
+                if dev_name in wanted_devs and dev_name not in details:
                     # FIX: Explicit error for unsupported non-file disk types
                     # (block devices, network disks, volume references).
                     if source is None:
@@ -187,20 +275,35 @@ def get_disk_details_from_xml(dom, target_devs_list):
                         )
                         return None
                     details[dev_name] = {'path': source.get('file')}
-                    found_devs.append(dev_name)
+                    # All requested disks resolved: skip the remaining devices.
+                    if len(details) == len(wanted_devs):
+                        break
+            device.clear()
     except Exception as e:
         logger.error(f"XML parse error: {e}")
         return None
 
-    missing_devs = [d for d in target_devs_list if d not in found_devs]
+    missing_devs = [d for d in target_devs_list if d not in details]
     if missing_devs:
         logger.error("=" * 60)
         logger.error(f"FATAL ERROR: Requested disks not found in VM definition: {missing_devs}")
-        logger.error(f"Disks found in VM: {found_devs}")
+        logger.error(f"Disks found in VM: {list(details)}")
         logger.error("Check the --disk parameter.")
         logger.error("=" * 60)
         return None
 
+    # Stat each source image once, here: the space check and the backup totals
+    # reuse info['size']. The calls run concurrently since on NFS/FUSE-backed
+    # images every stat() is a round-trip to the server.
+    try:
+        with ThreadPoolExecutor(max_workers=min(8, len(details))) as pool:
+            sizes = pool.map(_allocated_size, [info['path'] for info in details.values()])
+            for info, size in zip(details.values(), sizes):
+                info['size'] = size
+    except OSError as e:
+        logger.error(f"Cannot stat source disk image: {e}")
+        return None
+
     return details
 
 
@@ -225,11 +328,10 @@ def check_clean_state(dom, disk_details):
     # stored in paths like /data/snapshots/vm-vda.qcow2.
     for dev, info in disk_details.items():
         full_path = info['path']
-        basename = os.path.basename(full_path)
         if any(p in full_path for p in FORBIDDEN_PATTERNS):
             return False, (
                 f"Disk '{dev}' path contains a forbidden pattern "
-                f"(path='{full_path}', basename='{basename}'). "
+                f"(path='{full_path}', basename='{os.path.basename(full_path)}'). "
                 "The disk appears to be a temporary or dirty snapshot."
             )
 
@@ -237,12 +339,11 @@ def check_clean_state(dom, disk_details):
 
 
 def check_available_space(backup_dir, disk_details):
-    needed = sum(
-        os.path.getsize(i['path']) for i in disk_details.values()
-    ) * (1 + SAFETY_MARGIN_PERCENT)
+    # Precondition: backup_dir already exists (created once by run_backup).
+    st = os.statvfs(backup_dir)
+    free_space = st.f_bavail * st.f_frsize  # Space available to unprivileged users
 
-    os.makedirs(backup_dir, exist_ok=True)
-    free_space = shutil.disk_usage(backup_dir).free
+    needed = sum(i['size'] for i in disk_details.values()) * (1 + SAFETY_MARGIN_PERCENT)
 
     if needed > free_space:
         logger.error(
@@ -298,26 +399,29 @@ def manage_retention(backup_dir, days):
     backups = []
 
     try:
-        for f in os.listdir(backup_dir):
-            if not f.endswith('.bak'):
-                continue
-            fp = os.path.join(backup_dir, f)
-
-            # FIX: Use timestamp embedded in the filename as primary date source.
-            # Fall back to mtime only if the filename doesn't match the expected pattern.
-            dt = _parse_timestamp_from_filename(f)
-            if dt is None:
-                logger.warning(
-                    f"Could not parse timestamp from filename '{f}', "
-                    "falling back to mtime."
-                )
-                dt = datetime.fromtimestamp(os.path.getmtime(fp))
+        # scandir yields the joined path and file type from a single getdents
+        # pass; stat() is only issued for the rare mtime fallback below.
+        with os.scandir(backup_dir) as entries:
+            for entry in entries:
+                f = entry.name
+                if not f.endswith('.bak') or not entry.is_file(follow_symlinks=False):
+                    continue
+
+                # FIX: Use timestamp embedded in the filename as primary date source.
+                # Fall back to mtime only if the filename doesn't match the expected pattern.
+                dt = _parse_timestamp_from_filename(f)
+                if dt is None:
+                    logger.warning(
+                        f"Could not parse timestamp from filename '{f}', "
+                        "falling back to mtime."
+                    )
+                    dt = datetime.fromtimestamp(entry.stat(follow_symlinks=False).st_mtime)
 
-            identity = _parse_identity_from_filename(f)
-            date_str = dt.strftime('%Y-%m-%d')
-            unique_key = f"{date_str}_{identity}"
+                identity = _parse_identity_from_filename(f)
+                date_str = dt.strftime('%Y-%m-%d')
+                unique_key = f"{date_str}_{identity}"
 
-            backups.append({'path': fp, 'dt': dt, 'unique_key': unique_key, 'name': f})
+                backups.append({'dt': dt, 'unique_key': unique_key, 'name': f})
 
         backups.sort(key=lambda x: x['dt'], reverse=True)
 
@@ -349,10 +453,10 @@ def manage_retention(backup_dir, days):
         keep_list.append(rescued)
         logger.warning(
             f"SAFETY LOCK: All backups are expired, but keeping the most recent one: "
-            f"{os.path.basename(rescued['path'])}"
+            f"{rescued['name']}"
         )
 
-    if sys.stdout.isatty():
+    if _IS_TTY:
         print()
     logger.info(f"--- RETENTION ANALYSIS ({days} days) ---")
 
@@ -363,43 +467,75 @@ def manage_retention(backup_dir, days):
 
     if delete_list:
         logger.info("CLEANUP (To be removed):")
-        for b, reason in delete_list:
-            logger.info(f"   [X]  {b['name']}")
-            logger.info(f"        Reason: {reason}")
+        # Unlinks run concurrently (each one is a server round-trip on NFS/CIFS
+        # destinations); results are still reported in the original order.
+        # Names are resolved relative to one directory fd (unlinkat) instead of
+        # walking the full backup path again for every file.
+        try:
+            dir_fd = os.open(backup_dir, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError as e:
+            logger.error(f"Cannot open backup directory for cleanup: {e}")
+        else:
             try:
-                os.remove(b['path'])
-                logger.info("        -> Removed successfully.")
-            except Exception as e:
-                logger.error(f"        -> Failed to remove: {e}")
+                with ThreadPoolExecutor(max_workers=min(8, len(delete_list))) as pool:
+                    removals = [
+                        pool.submit(os.unlink, b['name'], dir_fd=dir_fd)
+                        for b, _ in delete_list
+                    ]
+                    for (b, reason), removal in zip(delete_list, removals):
+                        logger.info(f"   [X]  {b['name']}")
+                        logger.info(f"        Reason: {reason}")
+                        try:
+                            removal.result()
+                            logger.info("        -> Removed successfully.")
+                        except Exception as e:
+                            logger.error(f"        -> Failed to remove: {e}")
+            finally:
+                os.close(dir_fd)
 
     logger.info("-" * 40)
-    if sys.stdout.isatty():
+    if _IS_TTY:
         print()
 
 
 # --- MONITORING AND BACKUP ---
 
-def monitor_global_progress(target_files, total_bytes_all_disks):
-    spinner = "|/-\\"
-    spin = spinner[int(time.time() * 4) % 4]
-
-    current_bytes_total = 0
-    for fp in target_files:
+def _written_bytes(paths):
+    """Bytes written so far to the backup files (one stat each; missing = 0)."""
+    total = 0
+    for fp in paths:
         try:
-            if os.path.exists(fp):
-                current_bytes_total += os.path.getsize(fp)
+            total += os.stat(fp).st_size
         except OSError:
             pass
+    return total
+
+
+def monitor_global_progress(target_files, total_bytes_all_disks):
+    # The spinner advances one frame per redraw, so it keeps moving even when
+    # slow progress limits redraws to one per PROGRESS_REDRAW_SECONDS.
+    spin = PROGRESS_SPINNER[_LAST_PROGRESS['frame'] % len(PROGRESS_SPINNER)]
+
+    current_bytes_total = _written_bytes(target_files)
 
     perc = (current_bytes_total / total_bytes_all_disks * 100) if total_bytes_all_disks > 0 else 0
     curr_gb = current_bytes_total / (1024 ** 3)
     total_gb = total_bytes_all_disks / (1024 ** 3)
 
-    msg = f"INFO: [ALL DISKS] [{spin}] {curr_gb:.2f} GB / {total_gb:.2f} GB ({perc:.1f}%)"
-
-    if sys.stdout.isatty():
-        sys.stdout.write(f"\r\033[K{msg}")
-        sys.stdout.flush()
+    msg = PROGRESS_TEMPLATE % (spin, curr_gb, total_gb, perc)
+
+    if _IS_TTY:
+        # Redraw only on a visible change (>= 0.1%) or to keep the spinner
+        # alive; each redraw is one write (erase-line included) and one flush.
+        now = time.time()
+        last = _LAST_PROGRESS['perc']
+        if (last is None or abs(perc - last) >= 0.1
+                or now - _LAST_PROGRESS['time'] >= PROGRESS_REDRAW_SECONDS):
+            sys.stdout.write(CLEAR_LINE + msg)
+            sys.stdout.flush()
+            _LAST_PROGRESS['perc'] = perc
+            _LAST_PROGRESS['time'] = now
+            _LAST_PROGRESS['frame'] += 1
 
     return msg
 
@@ -430,10 +566,12 @@ def verify_backup_integrity(target_files_map):
             continue
 
         # Check 3: qemu-img structural check (only for qcow2)
-        if DISK_FORMAT == 'qcow2':
+        if DISK_FORMAT == 'qcow2' and QEMU_IMG is None:
+            logger.warning("   [SKIP] qemu-img not found — skipping structural check.")
+        elif DISK_FORMAT == 'qcow2':
             try:
                 result = subprocess.run(
-                    ['qemu-img', 'check', '-q', fp],
+                    [QEMU_IMG, 'check', '-q', fp],
                     capture_output=True,
                     timeout=120
                 )
@@ -457,40 +595,75 @@ def verify_backup_integrity(target_files_map):
     return all_ok
 
 
+def drop_page_cache(paths):
+    """
+    Advise the kernel that the finished backup files will not be read again
+    soon (POSIX_FADV_DONTNEED), so the multi-GB copy does not evict the
+    running guests' working set from the host page cache. Source images are
+    left alone: their cached pages may belong to the live VM.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for fp in paths:
+        try:
+            fd = os.open(fp, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.warning(f"Could not drop page cache for {os.path.basename(fp)}: {e}")
+
+
 def run_atomic_backup(dom, backup_dir, disk_details, timestamp):
     global BACKUP_JOB_RUNNING, FILES_TO_CLEANUP
 
     logger.info("Starting ATOMIC backup (Parallel/Consistent)...")
 
     # 1. Prepare paths and calculate totals
-    disk_xml_fragments = []
-    target_files_map = {}
-    total_bytes_source = 0
-
-    for dev, info in disk_details.items():
-        fp = os.path.join(backup_dir, f"{dom.name()}-{dev}-{timestamp}.{DISK_FORMAT}.bak")
-        target_files_map[dev] = fp
-        FILES_TO_CLEANUP.append(fp)
-
-        disk_xml_fragments.append(
-            f"<disk name='{dev}' type='file'>"
-            f"<target file='{fp}'/>"
-            f"<driver type='{DISK_FORMAT}'/>"
-            f"</disk>"
-        )
+    domain_name = dom.name()
+    target_files_map = {
+        dev: os.path.join(backup_dir, f"{domain_name}-{dev}-{timestamp}.{DISK_FORMAT}.bak")
+        for dev in disk_details
+    }
+    FILES_TO_CLEANUP.extend(target_files_map.values())
+    total_bytes_source = sum(info['size'] for info in disk_details.values())
 
-        total_bytes_source += os.path.getsize(info['path'])
+    for dev, fp in target_files_map.items():
         logger.info(f" -> Queued disk '{dev}': {fp}")
+    _LAST_PROGRESS['perc'] = None
 
-    # 2. Construct single atomic XML
-    full_xml = (
-        f"<domainbackup>"
-        f"<disks>{''.join(disk_xml_fragments)}</disks>"
-        f"</domainbackup>"
-    )
+    # 2. Construct single atomic XML (serialized by ElementTree so paths with
+    #    quotes or '&' are escaped correctly)
+    backup_root = ET.Element('domainbackup')
+    disks_elem = ET.SubElement(backup_root, 'disks')
+    for dev, fp in target_files_map.items():
+        disk_elem = ET.SubElement(disks_elem, 'disk', name=dev, type='file')
+        ET.SubElement(disk_elem, 'target', file=fp)
+        ET.SubElement(disk_elem, 'driver', type=DISK_FORMAT)
+    full_xml = ET.tostring(backup_root, encoding='unicode')
 
     logger.info(f"Total source size: {total_bytes_source / (1024**3):.2f} GB")
 
+    # Completion is delivered by the JOB_COMPLETED event when the libvirt event
+    # loop is running; jobStats() polling then only acts as a safety net.
+    conn = dom.connect()
+    job_done = threading.Event()
+    job_result = {}
+    callback_id = None
+
+    def on_job_completed(_conn, _dom, params, _opaque):
+        job_result.update(params)
+        job_done.set()
+
+    if EVENT_LOOP_RUNNING:
+        try:
+            callback_id = conn.domainEventRegisterAny(
+                dom, libvirt.VIR_DOMAIN_EVENT_ID_JOB_COMPLETED, on_job_completed, None
+            )
+        except (libvirt.libvirtError, AttributeError) as e:
+            logger.warning(f"Job completion events unavailable, falling back to polling: {e}")
+
     try:
         # 3. Start ONE job for ALL disks
         logger.info("[Libvirt] Requesting atomic backup...")
@@ -502,60 +675,114 @@ def run_atomic_backup(dom, backup_dir, disk_details, timestamp):
         logger.info("[Libvirt] Backup streams started.")
 
         last_log_time = 0
+        next_stats_poll = 0
+        stats_interval = STATS_POLL_MIN_SECONDS
+        last_processed = None
         target_files_list = list(target_files_map.values())
         job_start_time = time.time()
+        # libvirt job-type constants, bound once instead of looked up per poll.
+        # job_failed_types is checked against the completed job's statistics.
+        job_none = libvirt.VIR_DOMAIN_JOB_NONE
+        job_failed_types = (libvirt.VIR_DOMAIN_JOB_FAILED, libvirt.VIR_DOMAIN_JOB_CANCELLED)
 
         while True:
             # FIX: Timeout watchdog — prevents infinite loop if QEMU hangs.
-            elapsed = time.time() - job_start_time
+            current_time = time.time()
+            elapsed = current_time - job_start_time
             if elapsed > BACKUP_TIMEOUT_SECONDS:
                 raise Exception(
                     f"Backup timeout exceeded ({BACKUP_TIMEOUT_SECONDS}s). "
                     "Job appears hung. Aborting."
                 )
 
-            # FIX: Distinguish between "job finished" and "communication error".
-            # jobStats() returning an empty dict or raising an exception are
-            # treated differently: only type==0 is a clean finish signal.
-            try:
-                stats = dom.jobStats()
-            except libvirt.libvirtError as e:
-                logger.warning(f"jobStats() communication error (will retry): {e}")
-                time.sleep(2)
-                continue
-
-            job_type = stats.get('type', -1)
-
-            if job_type == 0:
-                # Clean finish: libvirt confirmed the job is gone.
-                if sys.stdout.isatty():
-                    print(f"\r\033[KINFO: [Success] Atomic backup finished.")
+            if job_done.is_set():
+                # Finish reported by the JOB_COMPLETED event; the job is gone.
+                # The event carries the completed-job statistics but not the job
+                # type: a failed or cancelled job has success=0 and an errmsg.
                 BACKUP_JOB_RUNNING = False
+                success = job_result.get(libvirt.VIR_DOMAIN_JOB_SUCCESS)
+                errmsg = job_result.get(libvirt.VIR_DOMAIN_JOB_ERRMSG)
+                if success is None and errmsg is None:
+                    # Payload without either field: ask libvirt for the type of
+                    # the job that just completed.
+                    try:
+                        final_type = dom.jobStats(libvirt.VIR_DOMAIN_JOB_STATS_COMPLETED).get('type')
+                        if final_type in job_failed_types:
+                            errmsg = f"job ended with type {final_type}"
+                    except libvirt.libvirtError as e:
+                        logger.warning(f"Could not read completed job statistics: {e}")
+                if errmsg or (success is not None and not success):
+                    raise Exception(
+                        f"Libvirt reported backup job failure: {errmsg or 'no error message'}"
+                    )
+                if _IS_TTY:
+                    sys.stdout.write(CLEAR_LINE + "INFO: [Success] Atomic backup finished.\n")
                 break
 
-            if job_type == -1 and not stats:
-                # Empty dict without explicit type — ambiguous. Verify with jobInfo.
+            if current_time >= next_stats_poll:
+                next_stats_poll = current_time + (
+                    stats_interval if callback_id is None else EVENT_FALLBACK_POLL_SECONDS
+                )
+
+                # FIX: Distinguish between "job finished" and "communication error".
+                # jobStats() returning an empty dict or raising an exception are
+                # treated differently: only VIR_DOMAIN_JOB_NONE is a clean finish signal.
                 try:
-                    if dom.jobInfo()[0] == 0:
-                        if sys.stdout.isatty():
-                            print(f"\r\033[KINFO: [Success] Atomic backup finished (confirmed via jobInfo).")
-                        BACKUP_JOB_RUNNING = False
-                        break
-                except libvirt.libvirtError:
-                    pass
-                logger.warning("jobStats() returned empty without type=0. Retrying...")
-                time.sleep(2)
-                continue
+                    stats = dom.jobStats()
+                except libvirt.libvirtError as e:
+                    logger.warning(f"jobStats() communication error (will retry): {e}")
+                    job_done.wait(2)
+                    continue
+
+                job_type = stats.get('type', -1)
+
+                if job_type == job_none:
+                    # Clean finish: libvirt confirmed the job is gone.
+                    if _IS_TTY:
+                        sys.stdout.write(CLEAR_LINE + "INFO: [Success] Atomic backup finished.\n")
+                    BACKUP_JOB_RUNNING = False
+                    break
+
+                if job_type == -1 and not stats:
+                    # Empty dict without explicit type — ambiguous. Verify with jobInfo.
+                    try:
+                        if dom.jobInfo()[0] == job_none:
+                            if _IS_TTY:
+                                sys.stdout.write(CLEAR_LINE + "INFO: [Success] Atomic backup finished (confirmed via jobInfo).\n")
+                            BACKUP_JOB_RUNNING = False
+                            break
+                    except libvirt.libvirtError:
+                        pass
+                    logger.warning("jobStats() returned empty without type=0. Retrying...")
+                    job_done.wait(2)
+                    continue
+
+                if callback_id is None:
+                    # Without events, back off while the job makes little progress
+                    # and tighten again on fast progress or close to the end, so
+                    # short jobs are not held up and long ones make fewer RPCs.
+                    # Backup jobs report disk_*; data_* is the generic fallback.
+                    processed = stats.get('disk_processed', stats.get('data_processed'))
+                    total = stats.get('disk_total', stats.get('data_total', 0))
+                    if processed is None or last_processed is None or not total:
+                        # No progress figures, or no earlier sample to compare.
+                        stats_interval = STATS_POLL_MIN_SECONDS
+                    else:
+                        remaining = stats.get('disk_remaining', total - processed)
+                        if (processed - last_processed > total * 0.05
+                                or remaining < total * 0.05):
+                            stats_interval = STATS_POLL_MIN_SECONDS
+                        elif processed == last_processed:
+                            stats_interval = min(stats_interval * 2, STATS_POLL_MAX_SECONDS)
+                    last_processed = processed
+                    next_stats_poll = current_time + stats_interval
 
             # Job is still running — continue monitoring.
 
-            current_time = time.time()
-            if sys.stdout.isatty():
+            if _IS_TTY:
                 monitor_global_progress(target_files_list, total_bytes_source)
             elif current_time - last_log_time > 60:
-                curr_size = sum(
-                    os.path.getsize(f) for f in target_files_list if os.path.exists(f)
-                )
+                curr_size = _written_bytes(target_files_list)
                 pct = (curr_size / total_bytes_source * 100) if total_bytes_source else 0
                 logger.info(
                     f"Progress: {curr_size / 1024**3:.2f} GB / "
@@ -564,12 +791,19 @@ def run_atomic_backup(dom, backup_dir, disk_details, timestamp):
                 )
                 last_log_time = current_time
 
-            time.sleep(0.5)
+            # Returns early as soon as the completion event fires.
+            job_done.wait(0.5)
 
     except Exception as e:
         logger.error(f"ERROR during atomic backup: {e}")
         perform_cleanup()
         raise
+    finally:
+        if callback_id is not None:
+            try:
+                conn.domainEventDeregisterAny(callback_id)
+            except libvirt.libvirtError:
+                pass
 
     # 4. FIX: Verify integrity before declaring success.
     integrity_ok = verify_backup_integrity(target_files_map)
@@ -587,14 +821,75 @@ def run_atomic_backup(dom, backup_dir, disk_details, timestamp):
         if fp in FILES_TO_CLEANUP:
             FILES_TO_CLEANUP.remove(fp)
 
+    drop_page_cache(target_files_map.values())
+
     logger.info("Atomic backup completed and verified successfully!")
 
 
+# --- BACKUP PROCEDURE ---
+
+def run_backup(conn, domain_name, backup_dir, target_devs_list, retention_days, timestamp):
+    """
+    Full procedure for one domain: pre-checks, atomic backup and retention.
+    Raises BackupError (or any unexpected exception) instead of exiting, so
+    several domains can be processed over one libvirt connection.
+    """
+    global CURRENT_DOMAIN, BACKUP_JOB_RUNNING, FILES_TO_CLEANUP, _CLEANUP_RUNNING
+
+    # Reset per-domain state left over from a previous domain in the batch.
+    CURRENT_DOMAIN = None
+    BACKUP_JOB_RUNNING = False
+    FILES_TO_CLEANUP = []
+    _CLEANUP_RUNNING = False
+
+    try:
+        dom = conn.lookupByName(domain_name)
+    except libvirt.libvirtError:
+        raise BackupError(f"VM '{domain_name}' not found in hypervisor.")
+
+    CURRENT_DOMAIN = dom
+
+    # Silently abort any stale job from a previous crashed run.
+    try:
+        if dom.jobInfo()[0] != libvirt.VIR_DOMAIN_JOB_NONE:
+            logger.warning("Stale job detected from a previous run. Attempting to abort...")
+            dom.abortJob()
+    except Exception:
+        pass
+
+    bkp_dir = os.path.join(backup_dir, domain_name)
+
+    details = get_disk_details_from_xml(dom, target_devs_list)
+    if not details:
+        raise BackupError("Requested disks not found or not supported.")
+
+    clean, msg = check_clean_state(dom, details)
+    if not clean:
+        raise BackupError(
+            f"ABORTED: {msg}\n"
+            "The VM must be clean (no active snapshots or jobs) before backup."
+        )
+
+    os.makedirs(bkp_dir, exist_ok=True)
+    if not check_available_space(bkp_dir, details):
+        raise BackupError("Insufficient space at destination.")
+
+    # Step 1: Atomic backup
+    run_atomic_backup(dom, bkp_dir, details, timestamp)
+
+    # Step 2: Retention cleanup
+    logger.info("Starting retention check...")
+    manage_retention(bkp_dir, retention_days)
+
+    logger.info("PROCEDURE FINISHED SUCCESSFULLY.")
+
+
 # --- MAIN ---
 if __name__ == "__main__":
 
     example_text = '''Example:
   vhot --domain vm741137 --backup-dir /mnt/Local/Container/C/Backup --disk vda --retention-days 7 --timeout 14401
+  vhot --domain vm741137 vm46176 --backup-dir /mnt/Local/Container/C/Backup --disk vda
 '''
 
     parser = argparse.ArgumentParser(
@@ -603,9 +898,10 @@ if __name__ == "__main__":
         formatter_class=argparse.RawTextHelpFormatter
     )
 
-    parser.add_argument('--domain', required=True, help="VM name (e.g., vm46176)")
+    parser.add_argument('--domain', required=True, nargs='+',
+                        help="VM name(s), backed up in order over one connection (e.g., vm46176)")
     parser.add_argument('--backup-dir', required=True, help="Base destination directory")
-    parser.add_argument('--disk', required=True, nargs='+', help="Disks to backup (e.g., vda vdb)")
+    parser.add_argument('--disk', required=True, nargs='+', help="Disks to backup on each VM (e.g., vda vdb)")
     parser.add_argument('--retention-days', type=int, default=7,
                         help="Retention window in days (default: 7)")
     parser.add_argument('--timeout', type=int, default=BACKUP_TIMEOUT_SECONDS,
@@ -614,73 +910,42 @@ if __name__ == "__main__":
     args = parser.parse_args()
     BACKUP_TIMEOUT_SECONDS = args.timeout
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-    setup_logging(args.domain, timestamp)
-
-    # FIX: Acquire per-domain lock before doing anything with the hypervisor.
-    acquire_lock(args.domain)
+    start_event_loop()
 
-    conn = None
     try:
         conn = libvirt.open(CONNECT_URI)
-        if conn is None:
-            logger.error(f"Failed to connect to hypervisor at '{CONNECT_URI}'.")
-            sys.exit(1)
-
-        try:
-            dom = conn.lookupByName(args.domain)
-        except libvirt.libvirtError:
-            logger.error(f"VM '{args.domain}' not found in hypervisor.")
-            sys.exit(1)
-
-        CURRENT_DOMAIN_NAME = args.domain
+    except libvirt.libvirtError as e:
+        print(f"FATAL: Failed to connect to hypervisor at '{CONNECT_URI}': {e}", file=sys.stderr)
+        sys.exit(1)
 
-        # Silently abort any stale job from a previous crashed run.
-        try:
-            if dom.jobInfo()[0] != 0:
-                logger.warning("Stale job detected from a previous run. Attempting to abort...")
-                subprocess.run(
-                    ['virsh', 'domjobabort', args.domain],
-                    stderr=subprocess.DEVNULL
+    failed_domains = []
+    try:
+        for domain_name in args.domain:
+            # Stamped per domain: retention dates and de-duplicates backups by
+            # the timestamp in the filename, and a batch can cross midnight.
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            setup_logging(domain_name, timestamp)
+            if EVENT_LOOP_ERROR is not None:
+                logger.warning(
+                    f"Could not register libvirt event loop (polling only): {EVENT_LOOP_ERROR}"
                 )
-        except Exception:
-            pass
-
-        bkp_dir = os.path.join(args.backup_dir, args.domain)
-
-        details = get_disk_details_from_xml(dom, args.disk)
-        if not details:
-            raise Exception("Requested disks not found or not supported.")
-
-        clean, msg = check_clean_state(dom, details)
-        if not clean:
-            logger.error(
-                f"\nABORTED: {msg}\n"
-                "The VM must be clean (no active snapshots or jobs) before backup."
-            )
-            sys.exit(1)
-
-        if not check_available_space(bkp_dir, details):
-            sys.exit(1)
-
-        # Step 1: Atomic backup
-        run_atomic_backup(dom, bkp_dir, details, timestamp)
-
-        # Step 2: Retention cleanup
-        logger.info("Starting retention check...")
-        manage_retention(bkp_dir, args.retention_days)
-
-        logger.info("PROCEDURE FINISHED SUCCESSFULLY.")
+            try:
+                # FIX: Acquire per-domain lock before doing anything with the hypervisor.
+                acquire_lock(domain_name)
+                run_backup(conn, domain_name, args.backup_dir, args.disk,
+                           args.retention_days, timestamp)
+            except BackupError as e:
+                logger.error(f"FATAL ERROR: {e}")
+                failed_domains.append(domain_name)
+            except Exception as e:
+                logger.exception(f"FATAL ERROR: {e}")
+                failed_domains.append(domain_name)
+            finally:
+                release_lock()
+                close_logging()
+    finally:
+        conn.close()
 
-    except Exception as e:
-        logger.exception(f"FATAL ERROR: {e}")
+    if failed_domains:
+        print(f"FAILED domains: {', '.join(failed_domains)}", file=sys.stderr)
         sys.exit(1)
-    finally:
-        try:
-            del dom
-        except Exception:
-            pass
-        if conn:
-            conn.close()
-        release_lock()
\ No newline at end of file